@@ -8,9 +8,12 @@ Reddit数据采集脚本 - 使用公开JSON接口
 直接运行: pixi run python reddit_scraper.py
 """
 
+import os
 import requests
 import time
-import json
+import threading
+import orjson
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from typing import List, Dict, Optional
 from datetime import datetime
 from pathlib import Path
@@ -18,6 +21,11 @@ from loguru import logger
 from urllib.parse import quote
 
 
+def _iso(ts: float) -> str:
+    """Unix时间戳转ISO格式字符串（本地时间，与datetime.fromtimestamp().isoformat()一致，但不创建datetime对象）"""
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(ts))
+
+
 class RedditJSONScraper:
     """Reddit公开JSON接口采集器"""
 
@@ -28,6 +36,11 @@ class RedditJSONScraper:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
         self.base_delay = 2  # 每个请求间隔2秒，避免被限制
+        self.max_workers = 5  # 并发获取评论的线程数
+        self.request_interval = 1.0  # 并发时全局限速：每秒最多1个请求
+        self._throttle_lock = threading.Lock()
+        self._next_request_at = 0.0
+        self._search_cache = {}  # (subreddit, query, min_comments, limit) -> 搜索结果
         logger.info("✅ Reddit JSON采集器初始化成功")
 
     def search_subreddit(
@@ -49,6 +62,12 @@ class RedditJSONScraper:
         Returns:
             符合条件的帖子列表（仅基本信息，不含评论）
         """
+        # 相同查询直接返回缓存结果，不再重复请求
+        cache_key = (subreddit.lower(), query.strip().lower(), min_comments, limit)
+        if cache_key in self._search_cache:
+            logger.info(f"🔁 命中搜索缓存 r/{subreddit} - 关键词: {query}")
+            return list(self._search_cache[cache_key])
+
         url = f"https://www.reddit.com/r/{subreddit}/search.json"
         params = {
             'q': query,
@@ -93,13 +112,24 @@ class RedditJSONScraper:
                 })
 
             logger.info(f"  ✅ 找到 {len(posts)} 个符合条件的帖子")
+            self._search_cache[cache_key] = posts
             time.sleep(self.base_delay)  # 延迟避免被限制
-            return posts
+            return list(posts)
 
         except Exception as e:
             logger.error(f"❌ 搜索失败: {e}")
             return []
 
+    def _throttle(self):
+        """全局请求限速（线程安全），保证相邻请求间隔不小于request_interval"""
+        with self._throttle_lock:
+            now = time.monotonic()
+            wait_time = self._next_request_at - now
+            self._next_request_at = max(now, self._next_request_at) + self.request_interval
+
+        if wait_time > 0:
+            time.sleep(wait_time)
+
     def get_post_with_comments(self, subreddit: str, post_id: str, max_comments: int = 100) -> Optional[Dict]:
         """
         获取帖子详情和评论
@@ -115,6 +145,7 @@ class RedditJSONScraper:
         url = f"https://www.reddit.com/r/{subreddit}/comments/{post_id}/.json"
 
         try:
+            self._throttle()  # 多线程共享的限速，替代固定sleep
             logger.info(f"  📥 获取帖子 {post_id} 的评论...")
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
@@ -128,6 +159,7 @@ class RedditJSONScraper:
             comments_data = data[1]['data']['children']
 
             # 提取帖子基本信息
+            comments = []
             post = {
                 'platform': 'reddit',
                 'type': 'submission',
@@ -137,14 +169,15 @@ class RedditJSONScraper:
                 'title': post_data['title'],
                 'content': post_data.get('selftext', '[链接帖子]'),
                 'author': post_data.get('author', '[deleted]'),
-                'created_at': datetime.fromtimestamp(post_data['created_utc']).isoformat(),
+                'created_at': _iso(post_data['created_utc']),
                 'upvotes': post_data['score'],
                 'upvote_ratio': post_data.get('upvote_ratio', 0),
                 'comment_count': post_data['num_comments'],
-                'comments': []
+                'comments': comments
             }
 
-            # 提取评论
+            # 提取评论（循环内只读局部变量，避免重复的字典/属性查找）
+            add_comment = comments.append
             comment_count = 0
             for comment_obj in comments_data:
                 if comment_count >= max_comments:
@@ -155,15 +188,18 @@ class RedditJSONScraper:
                     continue
 
                 comment = comment_obj['data']
+                body = comment.get('body', '')
+                author = comment.get('author', '[deleted]')
 
-                # 跳过被删除的评论
-                if comment.get('author') == '[deleted]' and comment.get('body') == '[deleted]':
+                # 跳过被删除的评论（先比较body，正常评论第一个条件即可短路）
+                if body == '[deleted]' and author == '[deleted]':
                     continue
 
-                post['comments'].append({
-                    'author': comment.get('author', '[deleted]'),
-                    'content': comment.get('body', ''),
-                    'created_at': datetime.fromtimestamp(comment['created_utc']).isoformat(),
+                created_at = _iso(comment['created_utc'])
+                add_comment({
+                    'author': author,
+                    'content': body,
+                    'created_at': created_at,
                     'upvotes': comment['score'],
                 })
 
@@ -175,7 +211,6 @@ class RedditJSONScraper:
             post['is_relevant'] = True
             post['relevance_note'] = 'Reddit公开API采集 - AI对程序员影响相关讨论'
 
-            time.sleep(self.base_delay)  # 延迟避免被限制
             return post
 
         except Exception as e:
@@ -202,44 +237,62 @@ class RedditJSONScraper:
             完整的帖子列表（包含评论）
         """
         all_posts = []
-        collected_ids = set()
+        collected_ids = set()  # Reddit帖子ID是base36编码，按int(id, 36)存储
 
+        # 预先展开 subreddit×关键词 查询列表，去掉重复查询（忽略大小写和首尾空白）
+        queries = []
+        seen_queries = set()
         for subreddit in subreddits:
+            for keyword in keywords:
+                query_key = (subreddit.lower(), keyword.strip().lower())
+                if query_key not in seen_queries:
+                    seen_queries.add(query_key)
+                    queries.append((subreddit, keyword.strip()))
+
+        for subreddit, keyword in queries:
             if len(all_posts) >= target_count:
                 break
 
-            for keyword in keywords:
-                if len(all_posts) >= target_count:
-                    break
-
-                # 搜索帖子（仅基本信息）
-                basic_posts = self.search_subreddit(
-                    subreddit=subreddit,
-                    query=keyword,
-                    min_comments=min_comments,
-                    limit=50
-                )
-
-                # 获取每个帖子的完整数据（包括评论）
-                for basic_post in basic_posts:
-                    if len(all_posts) >= target_count:
+            # 搜索帖子（仅基本信息）
+            basic_posts = self.search_subreddit(
+                subreddit=subreddit,
+                query=keyword,
+                min_comments=min_comments,
+                limit=50
+            )
+
+            # 并发获取每个帖子的完整数据（包括评论）
+            # 滑动窗口提交：已采集数 + 进行中数 不超过目标数量
+            candidates = (bp for bp in basic_posts if int(bp['id'], 36) not in collected_ids)
+            pending = {}
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                while True:
+                    while (len(pending) < self.max_workers
+                           and len(all_posts) + len(pending) < target_count):
+                        basic_post = next(candidates, None)
+                        if basic_post is None:
+                            break
+                        future = executor.submit(
+                            self.get_post_with_comments,
+                            subreddit=basic_post['subreddit'],
+                            post_id=basic_post['id'],
+                            max_comments=100
+                        )
+                        pending[future] = basic_post
+
+                    if not pending:
                         break
 
-                    # 去重
-                    if basic_post['id'] in collected_ids:
-                        continue
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        basic_post = pending.pop(future)
+                        full_post = future.result()
 
-                    # 获取完整数据
-                    full_post = self.get_post_with_comments(
-                        subreddit=basic_post['subreddit'],
-                        post_id=basic_post['id'],
-                        max_comments=100
-                    )
-
-                    if full_post:
-                        all_posts.append(full_post)
-                        collected_ids.add(basic_post['id'])
-                        logger.info(f"✅ 已采集 {len(all_posts)}/{target_count} 个帖子")
+                        if full_post:
+                            all_posts.append(full_post)
+                            collected_ids.add(int(basic_post['id'], 36))
+                            logger.info(f"✅ 已采集 {len(all_posts)}/{target_count} 个帖子")
 
         return all_posts
 
@@ -254,8 +307,24 @@ class RedditJSONScraper:
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(posts, f, ensure_ascii=False, indent=2)
+        # 先写临时文件再原子替换：进程中途被杀时保留上一次的完整数据
+        tmp_path = output_path.with_suffix(output_path.suffix + '.tmp')
+
+        # 逐个帖子序列化写入，峰值内存只占一个帖子的序列化结果
+        last_index = len(posts) - 1
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(b'[\n')
+                for i, post in enumerate(posts):
+                    f.write(orjson.dumps(post, option=orjson.OPT_INDENT_2))
+                    f.write(b',\n' if i < last_index else b'\n')
+                f.write(b']\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
 
         logger.info(f"💾 数据已保存到: {output_path}")
         logger.info(f"📊 共保存 {len(posts)} 个帖子")
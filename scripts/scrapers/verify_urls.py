@@ -6,6 +6,7 @@ import sys
 from pathlib import Path
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional
 import requests
 from bs4 import BeautifulSoup
@@ -25,6 +26,48 @@ HEADERS = {
 
 REQUEST_TIMEOUT = 30
 REQUEST_DELAY = 3  # 每个请求之间延迟3秒
+HOST_CONCURRENCY = 4  # 每个站点的最大并发请求数，各站点互不阻塞
+
+ANSWER_COUNT_PATTERN = re.compile(r'(\d+)\s*个回答')
+ZHIHU_FIELDS = ('title', 'sidebar', 'meta_description', 'answer_button', 'published_time')
+
+
+def scan_zhihu_page(soup: BeautifulSoup) -> Dict:
+    """
+    单次遍历知乎页面DOM，收集验证所需的所有节点
+
+    相比对每个字段分别调用soup.find（每次都从根节点重新扫描），
+    这里只遍历一次，并在所有字段都找到后提前退出。
+
+    Returns:
+        {字段名: 节点}，未找到的字段不在结果中
+    """
+    found = {}
+    for elem in soup.descendants:
+        name = elem.name  # 文本节点的name为None
+        if name == 'h1':
+            if 'title' not in found and 'QuestionHeader-title' in elem.get('class', ()):
+                found['title'] = elem
+        elif name == 'div':
+            if 'sidebar' not in found and 'QuestionAnswers-answers' in elem.get('class', ()):
+                found['sidebar'] = elem
+        elif name == 'meta':
+            prop = elem.get('property')
+            if prop == 'og:description':
+                found.setdefault('meta_description', elem)
+            elif prop == 'article:published_time':
+                found.setdefault('published_time', elem)
+        elif name == 'button':
+            if ('answer_button' not in found and elem.string
+                    and ANSWER_COUNT_PATTERN.search(elem.string)):
+                found['answer_button'] = elem
+        else:
+            continue
+
+        if len(found) == len(ZHIHU_FIELDS):
+            break
+
+    return found
 
 
 class URLVerifier:
@@ -63,41 +106,42 @@ class URLVerifier:
                 }
 
             soup = BeautifulSoup(response.text, 'html.parser')
+            nodes = scan_zhihu_page(soup)
 
             # 提取标题
-            title_elem = soup.find('h1', class_='QuestionHeader-title')
+            title_elem = nodes.get('title')
             title = title_elem.get_text(strip=True) if title_elem else "未知标题"
 
             # 提取回答数（知乎的回答就是评论）
             answer_count = 0
 
             # 方法1: 从侧边栏提取
-            sidebar = soup.find('div', class_='QuestionAnswers-answers')
+            sidebar = nodes.get('sidebar')
             if sidebar:
                 count_text = sidebar.get_text()
-                match = re.search(r'(\d+)\s*个回答', count_text)
+                match = ANSWER_COUNT_PATTERN.search(count_text)
                 if match:
                     answer_count = int(match.group(1))
 
             # 方法2: 从页面meta标签提取
             if answer_count == 0:
-                meta_count = soup.find('meta', property='og:description')
+                meta_count = nodes.get('meta_description')
                 if meta_count:
                     content = meta_count.get('content', '')
-                    match = re.search(r'(\d+)\s*个回答', content)
+                    match = ANSWER_COUNT_PATTERN.search(content)
                     if match:
                         answer_count = int(match.group(1))
 
             # 方法3: 从按钮文本提取
             if answer_count == 0:
-                answer_button = soup.find('button', string=re.compile(r'\d+\s*个回答'))
+                answer_button = nodes.get('answer_button')
                 if answer_button:
                     match = re.search(r'(\d+)', answer_button.get_text())
                     if match:
                         answer_count = int(match.group(1))
 
             # 提取发布时间
-            time_elem = soup.find('meta', property='article:published_time')
+            time_elem = nodes.get('published_time')
             publish_date = time_elem.get('content', '').split('T')[0] if time_elem else "未知"
 
             result = {
@@ -210,6 +254,15 @@ class URLVerifier:
             logger.error(f"不支持的平台: {platform}")
             return None
 
+    def _verify_post(self, post: Dict, platform: str) -> Optional[Dict]:
+        """验证单个帖子并附加平台信息（在对应站点的线程池中执行）"""
+        result = self.verify_url(post['url'], platform)
+        if result:
+            result['platform'] = platform
+            result['original_info'] = post
+        time.sleep(REQUEST_DELAY)  # 每个并发槽位内保持请求间隔
+        return result
+
     def verify_all_urls(self, discovered_urls_file: Path) -> List[Dict]:
         """验证所有URL"""
         logger.info("=" * 60)
@@ -221,29 +274,30 @@ class URLVerifier:
         zhihu_posts = data.get('zhihu_posts', [])
         v2ex_posts = data.get('v2ex_posts', [])
 
-        all_results = []
-
-        # 验证知乎帖子
-        logger.info(f"\n【1/2】验证知乎帖子 ({len(zhihu_posts)}个)")
-        for i, post in enumerate(zhihu_posts, 1):
-            logger.info(f"\n进度: {i}/{len(zhihu_posts)}")
-            result = self.verify_zhihu_question(post['url'])
-            if result:
-                result['platform'] = 'zhihu'
-                result['original_info'] = post
-                all_results.append(result)
-            time.sleep(REQUEST_DELAY)
-
-        # 验证V2EX帖子
-        logger.info(f"\n【2/2】验证V2EX帖子 ({len(v2ex_posts)}个)")
-        for i, post in enumerate(v2ex_posts, 1):
-            logger.info(f"\n进度: {i}/{len(v2ex_posts)}")
-            result = self.verify_v2ex_post(post['url'])
-            if result:
-                result['platform'] = 'v2ex'
-                result['original_info'] = post
-                all_results.append(result)
-            time.sleep(REQUEST_DELAY)
+        tasks = [(post, 'zhihu') for post in zhihu_posts] + [(post, 'v2ex') for post in v2ex_posts]
+        logger.info(
+            f"\n并发验证: 知乎 {len(zhihu_posts)}个, V2EX {len(v2ex_posts)}个 "
+            f"(每站点并发 {HOST_CONCURRENCY})"
+        )
+
+        # 每个站点一个线程池：线程池大小即该站点的并发上限，慢站点不会占用另一站点的名额
+        executors = {
+            platform: ThreadPoolExecutor(max_workers=HOST_CONCURRENCY)
+            for platform in ('zhihu', 'v2ex')
+        }
+        try:
+            futures = [
+                executors[platform].submit(self._verify_post, post, platform)
+                for post, platform in tasks
+            ]
+            for i, _ in enumerate(as_completed(futures), 1):
+                logger.info(f"进度: {i}/{len(futures)}")
+        finally:
+            for executor in executors.values():
+                executor.shutdown(wait=True)
+
+        # 按原始顺序（先知乎后V2EX）汇总结果
+        all_results = [result for result in (f.result() for f in futures) if result]
 
         self.results = all_results
         return all_results
@@ -255,7 +309,7 @@ class URLVerifier:
 
         meets_requirement = [r for r in self.results if r.get('meets_requirement')]
 
-        report = f"""
+        parts = [f"""
 {'='*60}
 URL验证报告
 {'='*60}
@@ -271,11 +325,11 @@ URL验证报告
 详细结果
 {'='*60}
 
-"""
+"""]
 
         # 符合要求的帖子
-        report += "\n✅ 符合要求的帖子 (评论>=100):\n"
-        report += "-" * 60 + "\n"
+        parts.append("\n✅ 符合要求的帖子 (评论>=100):\n")
+        parts.append("-" * 60 + "\n")
         for i, result in enumerate(meets_requirement, 1):
             platform = result.get('platform', '未知')
             title = result.get('title', '未知标题')
@@ -283,48 +337,48 @@ URL验证报告
             url = result.get('url', '')
             date = result.get('publish_date', '未知')
 
-            report += f"\n{i}. [{platform.upper()}] {title}\n"
-            report += f"   评论数: {count}\n"
-            report += f"   发布时间: {date}\n"
-            report += f"   URL: {url}\n"
+            parts.append(f"\n{i}. [{platform.upper()}] {title}\n")
+            parts.append(f"   评论数: {count}\n")
+            parts.append(f"   发布时间: {date}\n")
+            parts.append(f"   URL: {url}\n")
 
         # 不符合要求的帖子
         not_meets = [r for r in self.results if r.get('verified') and not r.get('meets_requirement')]
         if not_meets:
-            report += "\n\n⚠️ 不符合要求的帖子 (评论<100):\n"
-            report += "-" * 60 + "\n"
+            parts.append("\n\n⚠️ 不符合要求的帖子 (评论<100):\n")
+            parts.append("-" * 60 + "\n")
             for i, result in enumerate(not_meets, 1):
                 platform = result.get('platform', '未知')
                 title = result.get('title', '未知标题')
                 count = result.get('comment_count', 0)
                 url = result.get('url', '')
 
-                report += f"\n{i}. [{platform.upper()}] {title}\n"
-                report += f"   评论数: {count} (不足100)\n"
-                report += f"   URL: {url}\n"
+                parts.append(f"\n{i}. [{platform.upper()}] {title}\n")
+                parts.append(f"   评论数: {count} (不足100)\n")
+                parts.append(f"   URL: {url}\n")
 
         # 验证失败的帖子
         failed = [r for r in self.results if not r.get('verified')]
         if failed:
-            report += "\n\n❌ 验证失败的帖子:\n"
-            report += "-" * 60 + "\n"
+            parts.append("\n\n❌ 验证失败的帖子:\n")
+            parts.append("-" * 60 + "\n")
             for i, result in enumerate(failed, 1):
                 url = result.get('url', '')
                 error = result.get('error', '未知错误')
 
-                report += f"\n{i}. URL: {url}\n"
-                report += f"   错误: {error}\n"
+                parts.append(f"\n{i}. URL: {url}\n")
+                parts.append(f"   错误: {error}\n")
 
-        report += "\n" + "=" * 60 + "\n"
-        report += f"\n结论: "
+        parts.append("\n" + "=" * 60 + "\n")
+        parts.append(f"\n结论: ")
         if len(meets_requirement) >= 18:
-            report += f"✅ 已找到{len(meets_requirement)}个符合要求的帖子，满足作业要求(>=18个)！\n"
+            parts.append(f"✅ 已找到{len(meets_requirement)}个符合要求的帖子，满足作业要求(>=18个)！\n")
         else:
             needed = 18 - len(meets_requirement)
-            report += f"⚠️ 还需要{needed}个符合要求的帖子才能满足作业要求(>=18个)\n"
-            report += f"   建议: 继续搜索知乎和V2EX上的相关讨论\n"
+            parts.append(f"⚠️ 还需要{needed}个符合要求的帖子才能满足作业要求(>=18个)\n")
+            parts.append(f"   建议: 继续搜索知乎和V2EX上的相关讨论\n")
 
-        return report
+        return ''.join(parts)
 
     def create_config_file(self, output_file: Path):
         """创建配置文件"""
@@ -1,14 +1,67 @@
 #!/usr/bin/env python3
 """文本分析脚本 - 关键词提取与情感分析"""
 
+import argparse
+import hashlib
 import json
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from itertools import chain
 from pathlib import Path
 from collections import Counter, defaultdict
 from datetime import datetime
 
+import numpy as np
+
+try:
+    import ahocorasick  # pyahocorasick，可选：多关键词单次扫描
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import jieba_fast as jieba  # 可选：C实现的jieba，接口与jieba一致
+    JIEBA_AVAILABLE = True
+except ImportError:
+    try:
+        import jieba  # 可选：基于词典的中文分词
+        JIEBA_AVAILABLE = True
+    except ImportError:
+        JIEBA_AVAILABLE = False
+
+try:
+    import orjson  # 可选：更快的JSON序列化
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson  # 可选：流式解析大JSON文件
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# 关键词统计结果缓存目录
+CACHE_DIR = Path("data/analysis/.cache")
+
+# 情感/主题扫描的文本数达到该值时启用多进程
+PARALLEL_MIN_TEXTS = 5000
+
+# --backend transformer 使用的情感分类模型（按语言）
+TRANSFORMER_MODELS = {
+    'en': 'distilbert-base-uncased-finetuned-sst-2-english',
+    'zh': 'uer/roberta-base-finetuned-jd-binary-chinese',
+}
+TRANSFORMER_BATCH_SIZE = 128
+
+# analyze_sentiment只缓存不超过该长度的文本（标题/短评论），长文本重复少，缓存只会占内存
+SENTIMENT_CACHE_MAX_TEXT_LEN = 280
+SENTIMENT_CACHE_SIZE = 4096
+
 # 中文停用词
-CHINESE_STOPWORDS = set([
+CHINESE_STOPWORDS = frozenset({
     '的', '了', '是', '我', '你', '他', '她', '它', '们', '这', '那', '有', '在', '不', '就', '也',
     '都', '和', '与', '或', '但', '而', '如果', '因为', '所以', '虽然', '但是', '可以', '能够',
     '已经', '正在', '将要', '会', '要', '能', '想', '觉得', '知道', '看', '说', '做', '去', '来',
@@ -17,10 +70,10 @@ CHINESE_STOPWORDS = set([
     '没有', '不是', '不会', '不能', '没', '吧', '呢', '啊', '吗', '呀', '嘛', '哦', '哈',
     '上', '下', '中', '里', '外', '前', '后', '左', '右', '东', '西', '南', '北',
     '年', '月', '日', '时', '分', '秒', '个', '只', '条', '件', '种', '位', '名',
-])
+})
 
 # 英文停用词
-ENGLISH_STOPWORDS = set([
+ENGLISH_STOPWORDS = frozenset({
     'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
     'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been', 'be', 'have', 'has', 'had',
     'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must',
@@ -85,7 +138,7 @@ ENGLISH_STOPWORDS = set([
     'particularly', 'specifically', 'generally', 'usually', 'often', 'sometimes', 'always',
     'never', 'ever', 'already', 'yet', 'soon', 'later', 'ago', 'today', 'tomorrow', 'yesterday',
     'etc', 'e', 'g', 'i', 'e'
-])
+})
 
 # AI/编程相关关键词（用于提取）
 AI_KEYWORDS = {
@@ -146,35 +199,272 @@ SENTIMENT_WORDS = {
     }
 }
 
+# 主题关键词
+TOPIC_KEYWORDS = {
+    'en': {
+        'job_replacement': ['replace', 'replacement', 'obsolete', 'automate', 'automation', 'layoff', 'unemployed'],
+        'skill_requirements': ['skill', 'skills', 'learn', 'learning', 'adapt', 'knowledge', 'experience'],
+        'career_development': ['career', 'job', 'hire', 'hiring', 'junior', 'senior', 'entry', 'promotion'],
+        'ai_tools': ['chatgpt', 'gpt', 'copilot', 'claude', 'cursor', 'tool', 'assistant', 'llm'],
+        'industry_impact': ['industry', 'market', 'company', 'tech', 'software', 'developer', 'programmer'],
+        'emotional_response': ['worry', 'fear', 'concern', 'hope', 'optimistic', 'pessimistic', 'anxious']
+    },
+    'zh': {
+        'job_replacement': ['取代', '替代', '淘汰', '自动化', '裁员', '失业'],
+        'skill_requirements': ['技能', '学习', '适应', '知识', '经验', '能力'],
+        'career_development': ['职业', '工作', '招聘', '初级', '高级', '晋升', '发展'],
+        'ai_tools': ['chatgpt', 'gpt', 'copilot', 'claude', '工具', '助手', '大模型'],
+        'industry_impact': ['行业', '市场', '公司', '技术', '软件', '开发', '程序员'],
+        'emotional_response': ['担心', '焦虑', '恐惧', '希望', '乐观', '悲观']
+    }
+}
+
+
+def build_automaton(word_groups: dict):
+    """
+    把 {标签: [关键词]} 构建成一个Aho-Corasick自动机
+
+    每个关键词的payload为 (关键词, 所属标签元组)，同一关键词可属于多个标签。
+    """
+    word_tags = defaultdict(list)
+    for tag, words in word_groups.items():
+        for word in words:
+            word_tags[word].append(tag)
+
+    automaton = ahocorasick.Automaton()
+    for word, tags in word_tags.items():
+        automaton.add_word(word, (word, tuple(tags)))
+    automaton.make_automaton()
+    return automaton
+
+
+def match_tags(automaton, text_lower: str) -> Counter:
+    """单次扫描文本，统计每个标签下出现过的不同关键词数"""
+    matched = {payload for _, payload in automaton.iter(text_lower)}
+    tag_counts = Counter()
+    for _, tags in matched:
+        tag_counts.update(tags)
+    return tag_counts
+
+
+def build_word_automaton(words: list):
+    """把一组关键词构建成Aho-Corasick自动机，配合iter_long统计最长且不重叠的出现次数"""
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        automaton.add_word(word, word)
+    automaton.make_automaton()
+    return automaton
+
+
+def build_word_pattern(words: list):
+    """
+    把一组关键词编译成按前缀树组织的正则，findall返回最长且不重叠的出现
+
+    与按长度倒序的简单交替正则匹配结果相同，但共享前缀只比较一次，
+    每个位置不必逐个尝试全部关键词
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = None  # 词尾标记
+
+    def to_regex(node: dict) -> str:
+        branches = [re.escape(char) + to_regex(child) for char, child in node.items() if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # 已构成完整词时后续部分可选，贪婪匹配保证优先取最长词
+        return f'(?:{body})?' if '' in node else body
+
+    return re.compile(to_regex(trie))
+
+
+# 预编译的正则表达式
+# BMP字符分类表：0=非词字符，1=中文字符（U+4E00~U+9FFF），2=其他词字符（与正则\w一致）
+CHAR_CLASS_TABLE = np.fromiter(
+    (1 if 0x4e00 <= code <= 0x9fff else 2 if chr(code).isalnum() or code == 0x5f else 0
+     for code in range(0x10000)),
+    dtype=np.uint8, count=0x10000
+)
+
+NON_CJK_PATTERN = re.compile(r'[^\u4e00-\u9fff]+')
+NON_WORD_PATTERN = re.compile(r'\W+')
+CJK_RUN_PATTERN = re.compile(r'[\u4e00-\u9fff]+')
+EN_WORD_PATTERN = re.compile(r'\b[a-z]+\b')
+
+# 每个主题的关键词合并为一个交替正则，一次search即可判断主题是否命中
+TOPIC_PATTERNS = {
+    lang: {
+        topic: re.compile('|'.join(map(re.escape, keywords)))
+        for topic, keywords in groups.items()
+    }
+    for lang, groups in TOPIC_KEYWORDS.items()
+}
+
+# 情感词正则：{语言: {'positive'/'negative': 正则}}，统计出现次数
+SENTIMENT_PATTERNS = {
+    lang: {
+        polarity: build_word_pattern(SENTIMENT_WORDS[polarity][lang])
+        for polarity in ('positive', 'negative')
+    }
+    for lang in ('en', 'zh')
+}
+
+# 中文常见词组（分词时优先提取）
+COMMON_CN_PHRASES = [
+    '人工智能', '机器学习', '深度学习', '大语言模型', '大模型', '程序员', '软件工程师',
+    '开发者', '工程师', '就业市场', '求职', '面试', '技术栈', '编程语言', '工作经验',
+    '职业发展', '职业规划', '技能提升', '自我提升', '终身学习', '持续学习',
+    '裁员', '失业', '内卷', '躺平', '35岁', '中年危机', '转行', '转型',
+    '自动化', '智能化', '数字化', 'chatgpt', 'gpt', 'ai', 'copilot'
+]
+
+
+# 启动时为每种语言构建一次自动机（情感词：positive/negative；主题词：按主题打标签）
+if AHOCORASICK_AVAILABLE:
+    SENTIMENT_AUTOMATA = {
+        lang: {
+            polarity: build_word_automaton(SENTIMENT_WORDS[polarity][lang])
+            for polarity in ('positive', 'negative')
+        }
+        for lang in ('en', 'zh')
+    }
+    TOPIC_AUTOMATA = {lang: build_automaton(groups) for lang, groups in TOPIC_KEYWORDS.items()}
+
+    # 词组payload为 (序号, 词组)，便于按原顺序输出
+    CN_PHRASE_AUTOMATON = ahocorasick.Automaton()
+    for index, phrase in enumerate(COMMON_CN_PHRASES):
+        CN_PHRASE_AUTOMATON.add_word(phrase, (index, phrase))
+    CN_PHRASE_AUTOMATON.make_automaton()
+else:
+    SENTIMENT_AUTOMATA = {}
+    TOPIC_AUTOMATA = {}
+    CN_PHRASE_AUTOMATON = None
+
+# 启动时把领域词组加入jieba词典（只加载一次），保证这些词组不被切开
+if JIEBA_AVAILABLE:
+    for word in dict.fromkeys(COMMON_CN_PHRASES + AI_KEYWORDS['zh']):
+        jieba.add_word(word)
+
+
+def iter_json_array(file_path: Path):
+    """
+    逐条读取JSON数组文件
+
+    安装了ijson时流式解析，内存中只保留当前元素；否则整体加载后逐条返回
+    """
+    if IJSON_AVAILABLE:
+        with open(file_path, 'rb') as f:
+            yield from ijson.items(f, 'item', use_float=True)
+    else:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+
+
+def corpus_signature(*file_paths: Path) -> str:
+    """
+    计算输入语料的签名，用作缓存键
+
+    由本脚本源码和各输入文件的路径/大小/修改时间组成，
+    修改分词规则、停用词或重新生成数据后缓存自动失效
+    """
+    digest = hashlib.md5(Path(__file__).read_bytes())
+    # 是否使用jieba会改变分词结果，也计入签名
+    digest.update(b'jieba' if JIEBA_AVAILABLE else b'builtin')
+    for file_path in file_paths:
+        stat = file_path.stat()
+        digest.update(f"{file_path}:{stat.st_size}:{stat.st_mtime_ns}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def load_cached_keywords(signature: str):
+    """读取关键词统计缓存，未命中返回None"""
+    cache_file = CACHE_DIR / f"keywords_{signature}.json"
+    if not cache_file.exists():
+        return None
+
+    if ORJSON_AVAILABLE:
+        cached = orjson.loads(cache_file.read_bytes())
+    else:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    return {lang: [tuple(item) for item in keywords] for lang, keywords in cached.items()}
+
+
+def save_cached_keywords(signature: str, keywords: dict) -> None:
+    """保存关键词统计缓存：{语言: [(词, 次数), ...]}"""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    write_json(CACHE_DIR / f"keywords_{signature}.json", keywords)
+
+
+def write_json(file_path: Path, data: dict) -> None:
+    """写出缩进2格、不转义非ASCII字符的JSON文件（优先使用orjson，一次性写入字节）"""
+    if ORJSON_AVAILABLE:
+        file_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
 
-def is_chinese(text: str) -> bool:
-    """判断文本是否主要是中文"""
-    chinese_chars = len(re.findall(r'[\u4e00-\u9fff]', text))
-    total_chars = len(re.findall(r'\w', text))
-    return chinese_chars > total_chars * 0.3 if total_chars > 0 else False
 
+def is_chinese(text: str) -> bool:
+    """
+    判断文本是否主要是中文
+
+    >>> is_chinese('\\ud83d 中文')  # 孤立代理项（截断的emoji转义）按非文字字符处理
+    True
+    """
+    # surrogatepass：孤立代理项各占一个码元，查表归为非文字字符，与正则的\w判断一致
+    code_units = np.frombuffer(text.encode('utf-16-le', 'surrogatepass'), dtype=np.uint16)
+    if len(code_units) == len(text):
+        # 全部为BMP字符：查表分类后一次计数，没有逐字符的Python循环
+        class_counts = np.bincount(CHAR_CLASS_TABLE[code_units], minlength=3)
+        chinese_chars = int(class_counts[1])
+        total_chars = chinese_chars + int(class_counts[2])
+    else:
+        # 含BMP以外的字符（emoji等），UTF-16代理对无法逐个查表，改用正则删除非目标字符后取长度
+        word_chars = NON_WORD_PATTERN.sub('', text)
+        total_chars = len(word_chars)
+        chinese_chars = len(NON_CJK_PATTERN.sub('', word_chars))
+
+    if total_chars == 0:
+        return False
+    return chinese_chars * 10 > total_chars * 3
+
+
+def tokenize_chinese(text: str, lowered: bool = False) -> list:
+    """
+    中文分词，lowered=True表示text已转小写
+
+    安装了jieba时按词典分词（已加入领域词组）；
+    否则使用简单分词（常见词组 + 连续中文字符串）
+    """
+    text_lower = text if lowered else text.lower()
+
+    if JIEBA_AVAILABLE:
+        # HMM=False：只做词典分词，跳过较慢的未登录词识别
+        words = []
+        for word in jieba.cut(text_lower, HMM=False):
+            word = word.strip()
+            if len(word) >= 2:
+                words.append(word)
+        return words
 
-def tokenize_chinese(text: str) -> list:
-    """简单的中文分词（基于字符和常见词组）"""
     # 提取中文词组和单字
     words = []
 
-    # 首先尝试提取常见词组
-    common_phrases = [
-        '人工智能', '机器学习', '深度学习', '大语言模型', '大模型', '程序员', '软件工程师',
-        '开发者', '工程师', '就业市场', '求职', '面试', '技术栈', '编程语言', '工作经验',
-        '职业发展', '职业规划', '技能提升', '自我提升', '终身学习', '持续学习',
-        '裁员', '失业', '内卷', '躺平', '35岁', '中年危机', '转行', '转型',
-        '自动化', '智能化', '数字化', 'chatgpt', 'gpt', 'ai', 'copilot'
-    ]
-
-    text_lower = text.lower()
-    for phrase in common_phrases:
-        if phrase in text_lower:
-            words.append(phrase)
+    # 首先尝试提取常见词组（按COMMON_CN_PHRASES的顺序输出，每个词组最多一次）
+    if CN_PHRASE_AUTOMATON is not None:
+        matched = sorted({payload for _, payload in CN_PHRASE_AUTOMATON.iter(text_lower)})
+        words.extend(phrase for _, phrase in matched)
+    else:
+        for phrase in COMMON_CN_PHRASES:
+            if phrase in text_lower:
+                words.append(phrase)
 
     # 提取单个中文字符（作为备选）
-    chinese_chars = re.findall(r'[\u4e00-\u9fff]+', text)
+    chinese_chars = CJK_RUN_PATTERN.findall(text)
     for chars in chinese_chars:
         if len(chars) >= 2:
             words.append(chars)
@@ -182,43 +472,67 @@ def tokenize_chinese(text: str) -> list:
     return words
 
 
-def tokenize_english(text: str) -> list:
-    """英文分词"""
+def tokenize_english(text: str, lowered: bool = False) -> list:
+    """英文分词，lowered=True表示text已转小写"""
     # 转小写并提取单词
-    text = text.lower()
-    words = re.findall(r'\b[a-z]+\b', text)
+    if not lowered:
+        text = text.lower()
+    words = EN_WORD_PATTERN.findall(text)
     return words
 
 
-def extract_keywords(texts: list, language: str, top_n: int = 50) -> list:
+def extract_keywords(texts: list, language: str, top_n: int = 50, lowered: bool = False) -> list:
     """提取关键词"""
-    word_freq = Counter()
-
     stopwords = CHINESE_STOPWORDS if language == 'zh' else ENGLISH_STOPWORDS
 
-    for text in texts:
-        if language == 'zh':
-            words = tokenize_chinese(text)
-        else:
-            words = tokenize_english(text)
+    tokenize = tokenize_chinese if language == 'zh' else tokenize_english
 
-        for word in words:
-            word = word.lower().strip()
-            if len(word) >= 2 and word not in stopwords:
-                word_freq[word] += 1
+    # 所有文本的分词结果展平成一个词流，由Counter一次性计数
+    # 分词结果已是小写且不含空白（英文已转小写，中文词组/汉字串无大小写），无需再lower/strip
+    tokens = chain.from_iterable(tokenize(text, lowered) for text in texts)
+    word_freq = Counter(word for word in tokens if len(word) >= 2 and word not in stopwords)
 
     return word_freq.most_common(top_n)
 
 
+def count_sentiment_words(text: str, language: str, lowered: bool = False) -> tuple:
+    """
+    统计文本中正面/负面情感词的出现次数，返回 (positive_count, negative_count)
+
+    同一个词出现多次计多次；词之间有重叠时（如layoff/layoffs）只计最长的那个
+    """
+    text_lower = text if lowered else text.lower()
+
+    automata = SENTIMENT_AUTOMATA.get(language)
+    if automata is not None:
+        positive_count = sum(1 for _ in automata['positive'].iter_long(text_lower))
+        negative_count = sum(1 for _ in automata['negative'].iter_long(text_lower))
+        return positive_count, negative_count
+
+    patterns = SENTIMENT_PATTERNS.get(language)
+    if patterns is None:
+        return 0, 0
+
+    # 直接在str上匹配：纯ASCII的str本身按单字节存储，编码成bytes后匹配反而更慢，
+    # 中文编码为UTF-8后长度变为3倍，更不划算
+    positive_count = len(patterns['positive'].findall(text_lower))
+    negative_count = len(patterns['negative'].findall(text_lower))
+    return positive_count, negative_count
+
+
+@lru_cache(maxsize=SENTIMENT_CACHE_SIZE)
+def _cached_sentiment_counts(text_lower: str, language: str) -> tuple:
+    """count_sentiment_words的缓存版本（text_lower需已转小写），重复出现的标题/短评论只统计一次"""
+    return count_sentiment_words(text_lower, language, lowered=True)
+
+
 def analyze_sentiment(text: str, language: str) -> dict:
     """分析文本情感"""
     text_lower = text.lower()
-
-    positive_words = SENTIMENT_WORDS['positive'].get(language, [])
-    negative_words = SENTIMENT_WORDS['negative'].get(language, [])
-
-    positive_count = sum(1 for word in positive_words if word in text_lower)
-    negative_count = sum(1 for word in negative_words if word in text_lower)
+    if len(text_lower) <= SENTIMENT_CACHE_MAX_TEXT_LEN:
+        positive_count, negative_count = _cached_sentiment_counts(text_lower, language)
+    else:
+        positive_count, negative_count = count_sentiment_words(text_lower, language, lowered=True)
 
     total = positive_count + negative_count
     if total == 0:
@@ -241,44 +555,163 @@ def analyze_sentiment(text: str, language: str) -> dict:
     }
 
 
-def extract_topics(texts: list, language: str) -> dict:
-    """提取主题分布"""
-    topics = {
-        'job_replacement': {'keywords': [], 'count': 0},
-        'skill_requirements': {'keywords': [], 'count': 0},
-        'career_development': {'keywords': [], 'count': 0},
-        'ai_tools': {'keywords': [], 'count': 0},
-        'industry_impact': {'keywords': [], 'count': 0},
-        'emotional_response': {'keywords': [], 'count': 0}
-    }
-
-    if language == 'en':
-        topics['job_replacement']['keywords'] = ['replace', 'replacement', 'obsolete', 'automate', 'automation', 'layoff', 'unemployed']
-        topics['skill_requirements']['keywords'] = ['skill', 'skills', 'learn', 'learning', 'adapt', 'knowledge', 'experience']
-        topics['career_development']['keywords'] = ['career', 'job', 'hire', 'hiring', 'junior', 'senior', 'entry', 'promotion']
-        topics['ai_tools']['keywords'] = ['chatgpt', 'gpt', 'copilot', 'claude', 'cursor', 'tool', 'assistant', 'llm']
-        topics['industry_impact']['keywords'] = ['industry', 'market', 'company', 'tech', 'software', 'developer', 'programmer']
-        topics['emotional_response']['keywords'] = ['worry', 'fear', 'concern', 'hope', 'optimistic', 'pessimistic', 'anxious']
-    else:
-        topics['job_replacement']['keywords'] = ['取代', '替代', '淘汰', '自动化', '裁员', '失业']
-        topics['skill_requirements']['keywords'] = ['技能', '学习', '适应', '知识', '经验', '能力']
-        topics['career_development']['keywords'] = ['职业', '工作', '招聘', '初级', '高级', '晋升', '发展']
-        topics['ai_tools']['keywords'] = ['chatgpt', 'gpt', 'copilot', 'claude', '工具', '助手', '大模型']
-        topics['industry_impact']['keywords'] = ['行业', '市场', '公司', '技术', '软件', '开发', '程序员']
-        topics['emotional_response']['keywords'] = ['担心', '焦虑', '恐惧', '希望', '乐观', '悲观']
-
-    for text in texts:
-        text_lower = text.lower()
-        for topic, data in topics.items():
-            for keyword in data['keywords']:
-                if keyword in text_lower:
-                    data['count'] += 1
-                    break
+def dedupe_texts(texts: list) -> tuple:
+    """
+    文本去重（转载、模板回复、空评论等重复文本只扫描一次）
+
+    Returns:
+        (unique_texts, inverse)：按首次出现顺序的去重文本，以及 texts[i] == unique_texts[inverse[i]] 的下标数组
+    """
+    positions = {}
+    inverse = np.fromiter(
+        (positions.setdefault(text, len(positions)) for text in texts), dtype=np.intp, count=len(texts)
+    )
+    return list(positions), inverse
+
+
+def map_text_chunks(func, texts: list) -> list:
+    """
+    把texts切块后交给 func(chunk) 处理，按顺序返回各块结果
+
+    文本数达到PARALLEL_MIN_TEXTS时按CPU核数切块并用多进程并行，
+    否则直接在当前进程处理整个列表（避免进程启动开销）
+    """
+    workers = os.cpu_count() or 1
+    if len(texts) < PARALLEL_MIN_TEXTS or workers == 1:
+        return [func(texts)]
+
+    chunk_size = -(-len(texts) // workers)
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, chunks))
+
+
+def count_sentiment_chunk(texts: list, language: str, lowered: bool = False) -> np.ndarray:
+    """统计一批文本的情感词数，返回形状为 (len(texts), 2) 的 [正面数, 负面数] 数组"""
+    return np.array(
+        [count_sentiment_words(text, language, lowered) for text in texts],
+        dtype=np.int32
+    ).reshape(-1, 2)
+
+
+def score_sentiments(texts: list, language: str, lowered: bool = False) -> tuple:
+    """
+    批量情感打分：逐条统计情感词数后，用NumPy一次性计算得分和标签
+
+    Returns:
+        (scores, labels)：保留3位小数的得分数组和标签数组，与analyze_sentiment逐条结果一致
+    """
+    # 重复文本只统计一次，再按下标展开回每条文本
+    unique_texts, inverse = dedupe_texts(texts)
+    counts = np.concatenate(map_text_chunks(
+        partial(count_sentiment_chunk, language=language, lowered=lowered), unique_texts
+    ))[inverse]
+    positive, negative = counts[:, 0], counts[:, 1]
+
+    raw_scores = (positive - negative) / np.maximum(positive + negative, 1)
+    labels = np.where(raw_scores > 0.2, 'positive',
+                      np.where(raw_scores < -0.2, 'negative', 'neutral'))
+    return np.round(raw_scores, 3), labels
+
+
+def score_sentiments_transformer(texts: list, language: str) -> tuple:
+    """
+    批量情感打分（transformers模型，有GPU时使用GPU）
+
+    得分为 P(正面) - P(负面)，取值范围与词典打分相同，沿用相同的标签阈值
+
+    Returns:
+        (scores, labels)：保留3位小数的得分数组和标签数组
+
+    Raises:
+        ImportError: transformers未安装
+    """
+    try:
+        import torch
+        from transformers import pipeline
+    except ImportError:
+        raise ImportError("需要安装transformers和torch: pixi add transformers pytorch")
+
+    if not texts:
+        return np.zeros(0), np.zeros(0, dtype='<U8')
+
+    classifier = pipeline(
+        'sentiment-analysis',
+        model=TRANSFORMER_MODELS['en' if language == 'en' else 'zh'],
+        device=0 if torch.cuda.is_available() else -1,
+        batch_size=TRANSFORMER_BATCH_SIZE,
+    )
+    results = classifier(texts, truncation=True)
+
+    # 两个模型都是二分类，标签名分别为 POSITIVE/NEGATIVE 和 positive (...)/negative (...)
+    confidence = np.fromiter((result['score'] for result in results), dtype=float, count=len(results))
+    is_positive = np.fromiter(
+        (result['label'].lower().startswith('pos') for result in results), dtype=bool, count=len(results)
+    )
+    raw_scores = np.where(is_positive, 2 * confidence - 1, 1 - 2 * confidence)
+    labels = np.where(raw_scores > 0.2, 'positive',
+                      np.where(raw_scores < -0.2, 'negative', 'neutral'))
+    return np.round(raw_scores, 3), labels
+
+
+def label_distribution(labels: np.ndarray) -> dict:
+    """统计情感标签分布"""
+    values, counts = np.unique(labels, return_counts=True)
+    return dict(zip(values.tolist(), counts.tolist()))
+
+
+def match_topic_chunk(texts: list, language: str, lowered: bool = False) -> np.ndarray:
+    """判断一批文本命中了哪些主题，返回形状为 (len(texts), 主题数) 的布尔数组，列按TOPIC_KEYWORDS中的主题顺序"""
+    lang = 'en' if language == 'en' else 'zh'
+    topic_patterns = TOPIC_PATTERNS[lang]
+    automaton = TOPIC_AUTOMATA.get(lang)
+    topics = list(topic_patterns)
+
+    hits = np.zeros((len(texts), len(topics)), dtype=bool)
+    for row, text in enumerate(texts):
+        text_lower = text if lowered else text.lower()
+        if automaton is not None:
+            matched = match_tags(automaton, text_lower)
+            hits[row] = [topic in matched for topic in topics]
+            continue
+
+        for column, pattern in enumerate(topic_patterns.values()):
+            if pattern.search(text_lower):
+                hits[row, column] = True
+
+    return hits
+
+
+def extract_topics(texts: list, language: str, lowered: bool = False) -> dict:
+    """提取主题分布（每条文本每个主题最多计1次）"""
+    topic_keywords = TOPIC_KEYWORDS['en' if language == 'en' else 'zh']
+
+    # 重复文本只匹配一次，命中结果按出现次数加权
+    unique_texts, inverse = dedupe_texts(texts)
+    occurrences = np.bincount(inverse, minlength=len(unique_texts))
+    hits = np.concatenate(map_text_chunks(
+        partial(match_topic_chunk, language=language, lowered=lowered), unique_texts
+    ))
+    topic_counts = occurrences @ hits
 
-    return topics
+    return {
+        topic: {'keywords': keywords, 'count': int(count)}
+        for (topic, keywords), count in zip(topic_keywords.items(), topic_counts)
+    }
 
 
 def main():
+    parser = argparse.ArgumentParser(
+        description="文本分析 - 关键词提取与情感分析"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["lexicon", "transformer"],
+        default="lexicon",
+        help="情感分析方式：lexicon为情感词典（默认，无额外依赖），transformer为预训练模型（需要transformers）"
+    )
+    args = parser.parse_args()
+
     processed_dir = Path("data/processed")
     analysis_dir = Path("data/analysis")
     analysis_dir.mkdir(parents=True, exist_ok=True)
@@ -287,57 +720,74 @@ def main():
     print("文本分析 - 关键词提取与情感分析")
     print("=" * 60)
 
-    # 加载数据
-    print("\n[1/5] 加载数据...")
-    with open(processed_dir / "merged_posts.json", 'r', encoding='utf-8') as f:
-        posts = json.load(f)
-
-    with open(processed_dir / "all_comments.json", 'r', encoding='utf-8') as f:
-        comments = json.load(f)
-
-    print(f"  ✓ 加载 {len(posts)} 个帖子, {len(comments)} 条评论")
-
-    # 分离中英文内容
-    print("\n[2/5] 分离中英文内容...")
+    # 流式加载数据并分离中英文内容，只保留分析需要的文本，不保留完整的帖子/评论对象
+    # 文本在这里统一转小写一次，后续分词/情感/主题分析都传入lowered=True，不再重复lower()
+    print("\n[1/4] 加载数据并分离中英文内容...")
     en_texts = []
     zh_texts = []
+    dated_posts = []  # 时间趋势分析用：(年份, 语言, 该帖子在对应语言文本列表中的下标)
 
-    for post in posts:
+    post_count = 0
+    posts_file = processed_dir / "merged_posts.json"
+    comments_file = processed_dir / "all_comments.json"
+
+    for post in iter_json_array(posts_file):
+        post_count += 1
         text = f"{post.get('title', '')} {post.get('content', '')}"
         if post.get('language') == 'zh' or is_chinese(text):
-            zh_texts.append(text)
+            lang, texts = 'zh', zh_texts
         else:
-            en_texts.append(text)
+            lang, texts = 'en', en_texts
+
+        date_str = post.get('created_at', '')
+        if date_str:
+            dated_posts.append((date_str[:4], lang, len(texts)))
+        texts.append(text.lower())
 
-    for comment in comments:
+    comment_count = 0
+    for comment in iter_json_array(comments_file):
+        comment_count += 1
         text = comment.get('content', '')
         if comment.get('platform') == 'v2ex' or is_chinese(text):
-            zh_texts.append(text)
+            zh_texts.append(text.lower())
         else:
-            en_texts.append(text)
+            en_texts.append(text.lower())
 
+    print(f"  ✓ 加载 {post_count} 个帖子, {comment_count} 条评论")
     print(f"  ✓ 英文文本: {len(en_texts)} 条")
     print(f"  ✓ 中文文本: {len(zh_texts)} 条")
 
     # 关键词提取
-    print("\n[3/5] 提取关键词...")
-    en_keywords = extract_keywords(en_texts, 'en', 100)
-    zh_keywords = extract_keywords(zh_texts, 'zh', 100)
+    print("\n[2/4] 提取关键词...")
+    signature = corpus_signature(posts_file, comments_file)
+    cached_keywords = load_cached_keywords(signature)
+    if cached_keywords is not None:
+        en_keywords = cached_keywords['en']
+        zh_keywords = cached_keywords['zh']
+        print("  ✓ 命中关键词缓存")
+    else:
+        en_keywords = extract_keywords(en_texts, 'en', 100, lowered=True)
+        zh_keywords = extract_keywords(zh_texts, 'zh', 100, lowered=True)
+        save_cached_keywords(signature, {'en': en_keywords, 'zh': zh_keywords})
 
     print(f"  ✓ 英文关键词 Top 10: {[kw[0] for kw in en_keywords[:10]]}")
     print(f"  ✓ 中文关键词 Top 10: {[kw[0] for kw in zh_keywords[:10]]}")
 
     # 情感分析
-    print("\n[4/5] 情感分析...")
-    en_sentiments = [analyze_sentiment(text, 'en') for text in en_texts]
-    zh_sentiments = [analyze_sentiment(text, 'zh') for text in zh_texts]
+    print(f"\n[3/4] 情感分析（{args.backend}）...")
+    if args.backend == "transformer":
+        en_scores, en_labels = score_sentiments_transformer(en_texts, 'en')
+        zh_scores, zh_labels = score_sentiments_transformer(zh_texts, 'zh')
+    else:
+        en_scores, en_labels = score_sentiments(en_texts, 'en', lowered=True)
+        zh_scores, zh_labels = score_sentiments(zh_texts, 'zh', lowered=True)
 
     # 统计情感分布
-    en_sentiment_dist = Counter([s['label'] for s in en_sentiments])
-    zh_sentiment_dist = Counter([s['label'] for s in zh_sentiments])
+    en_sentiment_dist = label_distribution(en_labels)
+    zh_sentiment_dist = label_distribution(zh_labels)
 
-    en_avg_score = sum(s['score'] for s in en_sentiments) / len(en_sentiments) if en_sentiments else 0
-    zh_avg_score = sum(s['score'] for s in zh_sentiments) / len(zh_sentiments) if zh_sentiments else 0
+    en_avg_score = float(en_scores.mean()) if en_scores.size else 0
+    zh_avg_score = float(zh_scores.mean()) if zh_scores.size else 0
 
     print(f"  ✓ 英文情感分布: {dict(en_sentiment_dist)}")
     print(f"    平均情感得分: {en_avg_score:.3f}")
@@ -345,9 +795,9 @@ def main():
     print(f"    平均情感得分: {zh_avg_score:.3f}")
 
     # 主题分析
-    print("\n[5/5] 主题分析...")
-    en_topics = extract_topics(en_texts, 'en')
-    zh_topics = extract_topics(zh_texts, 'zh')
+    print("\n[4/4] 主题分析...")
+    en_topics = extract_topics(en_texts, 'en', lowered=True)
+    zh_topics = extract_topics(zh_texts, 'zh', lowered=True)
 
     print("  ✓ 英文主题分布:")
     for topic, data in en_topics.items():
@@ -359,15 +809,11 @@ def main():
 
     # 时间趋势分析
     print("\n[附加] 时间趋势分析...")
+    # 直接复用情感分析阶段每个帖子的得分，不再重新打分
+    scores_by_lang = {'en': en_scores, 'zh': zh_scores}
     time_sentiment = defaultdict(list)
-    for post in posts:
-        date_str = post.get('created_at', '')
-        if date_str:
-            year = date_str[:4]
-            lang = 'zh' if post.get('language') == 'zh' else 'en'
-            text = f"{post.get('title', '')} {post.get('content', '')}"
-            sentiment = analyze_sentiment(text, lang)
-            time_sentiment[year].append(sentiment['score'])
+    for year, lang, index in dated_posts:
+        time_sentiment[year].append(float(scores_by_lang[lang][index]))
 
     time_trend = {}
     for year, scores in sorted(time_sentiment.items()):
@@ -409,16 +855,14 @@ def main():
         'time_trend': time_trend
     }
 
-    with open(analysis_dir / "text_analysis_results.json", 'w', encoding='utf-8') as f:
-        json.dump(analysis_results, f, ensure_ascii=False, indent=2)
+    write_json(analysis_dir / "text_analysis_results.json", analysis_results)
     print(f"  ✓ 分析结果: {analysis_dir / 'text_analysis_results.json'}")
 
     # 保存关键词详情（用于词云）
-    with open(analysis_dir / "keywords_for_wordcloud.json", 'w', encoding='utf-8') as f:
-        json.dump({
-            'english': dict(en_keywords),
-            'chinese': dict(zh_keywords)
-        }, f, ensure_ascii=False, indent=2)
+    write_json(analysis_dir / "keywords_for_wordcloud.json", {
+        'english': dict(en_keywords),
+        'chinese': dict(zh_keywords)
+    })
     print(f"  ✓ 词云数据: {analysis_dir / 'keywords_for_wordcloud.json'}")
 
     print("\n" + "=" * 60)
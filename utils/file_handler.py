@@ -4,11 +4,20 @@
 使用orjson（Rust实现）处理JSON，比标准库快数倍
 使用polars处理结构化数据，比pandas快很多
 """
+import json
+import mmap
+import os
 import orjson
 from pathlib import Path
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Literal, Optional, Union
 from loguru import logger
 
+# Parquet每个行组的行数（流式写出时的缓冲粒度）
+PARQUET_ROW_GROUP_SIZE = 64_000
+
+# 各存储位置默认的Parquet压缩方式
+PARQUET_COMPRESSION = {"local": "lz4", "cloud": "zstd"}
+
 try:
     import polars as pl
     POLARS_AVAILABLE = True
@@ -16,10 +25,34 @@ except ImportError:
     POLARS_AVAILABLE = False
     logger.warning("Polars未安装，Parquet功能不可用")
 
+# 各平台帖子的公共字段类型，保存帖子时直接指定，不必逐行推断
+POST_SCHEMA = {
+    "platform": pl.Utf8,
+    "url": pl.Utf8,
+    "title": pl.Utf8,
+    "content": pl.Utf8,
+    "author": pl.Utf8,
+    "created_at": pl.Utf8,  # 各平台格式不一（ISO/相对时间文本），保留原始字符串
+    "scraped_at": pl.Utf8,
+    "upvotes": pl.Int64,
+    "comment_count": pl.Int64,
+} if POLARS_AVAILABLE else {}
+
+# 本进程中已确认存在的目录，批量写文件时不必每次都调用mkdir
+_ENSURED_DIRS = set()
+
+
+def _ensure_dir(directory: Union[str, os.PathLike]) -> None:
+    """确保目录存在（每个目录只创建/检查一次；空字符串表示当前目录）"""
+    key = os.fspath(directory)
+    if key and key not in _ENSURED_DIRS:
+        os.makedirs(key, exist_ok=True)
+        _ENSURED_DIRS.add(key)
+
 
 def save_json(
     data: Union[Dict, List],
-    file_path: Union[str, Path],
+    file_path: Union[str, bytes, os.PathLike],
     pretty: bool = False,
     ensure_ascii: bool = False
 ) -> None:
@@ -32,26 +65,34 @@ def save_json(
         pretty: 是否格式化输出
         ensure_ascii: 是否转义非ASCII字符
     """
-    file_path = Path(file_path)
-    file_path.parent.mkdir(parents=True, exist_ok=True)
+    # 只转换一次为字符串路径，不再构造Path对象
+    file_path = os.fsdecode(file_path)
+    _ensure_dir(os.path.dirname(file_path))
 
-    # 配置orjson选项
-    options = 0
+    # 配置orjson选项：numpy数组直接序列化；与标准库json一致，允许int等非字符串键
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
     if pretty:
         options |= orjson.OPT_INDENT_2
-    if not ensure_ascii:
-        options |= orjson.OPT_NON_STR_KEYS
 
-    # 序列化并写入
+    # 序列化并写入（orjson从不转义非ASCII字符，需要转义时交给标准库重新输出）
     json_bytes = orjson.dumps(data, option=options)
-    file_path.write_bytes(json_bytes)
+    if ensure_ascii:
+        json_bytes = json.dumps(
+            orjson.loads(json_bytes),
+            ensure_ascii=True,
+            indent=2 if pretty else None,
+            separators=None if pretty else (',', ':')
+        ).encode('ascii')
+
+    with open(file_path, 'wb') as f:
+        f.write(json_bytes)
 
-    logger.debug(f"JSON文件已保存: {file_path}")
+    logger.debug("JSON文件已保存: {}", file_path)
 
 
-def load_json(file_path: Union[str, Path]) -> Union[Dict, List]:
+def load_json(file_path: Union[str, bytes, os.PathLike]) -> Union[Dict, List]:
     """
-    加载JSON文件（使用orjson）
+    加载JSON文件（使用orjson + 内存映射）
 
     Args:
         file_path: 文件路径
@@ -59,30 +100,52 @@ def load_json(file_path: Union[str, Path]) -> Union[Dict, List]:
     Returns:
         解析后的数据
     """
-    file_path = Path(file_path)
-
-    if not file_path.exists():
-        raise FileNotFoundError(f"文件不存在: {file_path}")
-
-    json_bytes = file_path.read_bytes()
-    data = orjson.loads(json_bytes)
-
-    logger.debug(f"JSON文件已加载: {file_path}")
+    file_path = os.fsdecode(file_path)
+
+    # 直接打开文件，不存在时由open报错，省去一次额外的stat
+    try:
+        f = open(file_path, 'rb')
+    except FileNotFoundError:
+        raise FileNotFoundError(f"文件不存在: {file_path}") from None
+
+    # 内存映射读取，orjson直接解析映射区，省去一次整文件拷贝
+    # 空文件无法映射，交给orjson按原方式报错
+    with f:
+        if f.seek(0, 2) == 0:
+            data = orjson.loads(b'')
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    data = orjson.loads(view)
+
+    logger.debug("JSON文件已加载: {}", file_path)
     return data
 
 
 def save_to_parquet(
-    data: List[Dict],
-    file_path: Union[str, Path],
-    compression: str = "zstd"
+    data: Union[List[Dict], "pl.LazyFrame"],
+    file_path: Union[str, bytes, os.PathLike],
+    compression: Optional[str] = None,
+    schema: Optional[Dict[str, Any]] = None,
+    storage_tier: Literal["local", "cloud"] = "local",
+    schema_overrides: Optional[Dict[str, Any]] = None
 ) -> None:
     """
     保存为Parquet格式（使用polars，高性能列式存储）
 
+    通过LazyFrame.sink_parquet按行组写出：传入LazyFrame时全程流式处理，不构建完整的DataFrame；
+    传入字典列表时仍会先一次性构建DataFrame，再按行组写出
+
+    压缩方式的取舍：本地磁盘/NVMe上读取瓶颈在CPU，zstd解压开销大于省下的I/O，
+    lz4解压几乎无开销；云存储/冷数据上I/O更贵，zstd的高压缩率更划算
+
     Args:
-        data: 数据列表（字典列表）
+        data: 数据列表（字典列表），或polars LazyFrame（如scan_ndjson的结果，全程流式处理）
         file_path: 文件路径
-        compression: 压缩方式（zstd/snappy/gzip/lz4/uncompressed）
+        compression: 压缩方式（zstd/snappy/gzip/lz4/uncompressed），默认按storage_tier选择
+        schema: 列类型，如 {"id": pl.Utf8, "score": pl.Int64}；已知结构时传入可跳过类型推断
+        storage_tier: 存储位置，local默认lz4，cloud默认zstd
+        schema_overrides: 部分列的类型（如POST_SCHEMA），其余列仍自动推断；数据中没有的列会被忽略
 
     Raises:
         ImportError: polars未安装
@@ -90,23 +153,28 @@ def save_to_parquet(
     if not POLARS_AVAILABLE:
         raise ImportError("需要安装polars: pixi add polars")
 
-    file_path = Path(file_path)
-    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path = os.fsdecode(file_path)
+    _ensure_dir(os.path.dirname(file_path))
 
-    # 转换为polars DataFrame
-    df = pl.DataFrame(data)
+    if compression is None:
+        compression = PARQUET_COMPRESSION[storage_tier]
 
-    # 保存为parquet
-    df.write_parquet(
+    if isinstance(data, pl.LazyFrame):
+        lazy_frame = data
+    else:
+        # 已知类型的列由schema/schema_overrides直接指定，不再推断；其余列按polars默认（前100行）推断
+        lazy_frame = pl.DataFrame(data, schema=schema, schema_overrides=schema_overrides).lazy()
+
+    lazy_frame.sink_parquet(
         file_path,
         compression=compression,
-        use_pyarrow=False  # 使用polars自己的实现
+        row_group_size=PARQUET_ROW_GROUP_SIZE
     )
 
-    logger.debug(f"Parquet文件已保存: {file_path} (行数: {len(df)}, 列数: {len(df.columns)})")
+    logger.debug("Parquet文件已保存: {}", file_path)
 
 
-def load_from_parquet(file_path: Union[str, Path]) -> pl.DataFrame:
+def load_from_parquet(file_path: Union[str, bytes, os.PathLike]) -> "pl.DataFrame":
     """
     从Parquet文件加载数据（使用polars）
 
@@ -123,32 +191,38 @@ def load_from_parquet(file_path: Union[str, Path]) -> pl.DataFrame:
     if not POLARS_AVAILABLE:
         raise ImportError("需要安装polars: pixi add polars")
 
-    file_path = Path(file_path)
+    file_path = os.fsdecode(file_path)
 
-    if not file_path.exists():
+    if not os.path.exists(file_path):
         raise FileNotFoundError(f"文件不存在: {file_path}")
 
     df = pl.read_parquet(file_path, use_pyarrow=False)
 
-    logger.debug(f"Parquet文件已加载: {file_path} (行数: {len(df)}, 列数: {len(df.columns)})")
+    logger.debug("Parquet文件已加载: {} (行数: {}, 列数: {})", file_path, df.height, df.width)
     return df
 
 
 def save_posts_batch(
-    posts: List[Dict],
+    posts: Optional[List[Dict]],
     output_dir: Union[str, Path],
-    format: str = "json"
+    format: str = "json",
+    posts_raw: Optional[List[bytes]] = None
 ) -> Path:
     """
     批量保存帖子数据
 
     Args:
-        posts: 帖子列表
+        posts: 帖子列表；传入posts_raw时可为None
         output_dir: 输出目录
         format: 保存格式（json/parquet）
+        posts_raw: 已序列化好的帖子JSON（每条一个bytes），仅json格式支持；
+            传入时逐条直接写出，不再序列化posts
 
     Returns:
         保存的文件路径
+
+    Raises:
+        ValueError: 格式不支持、parquet格式传入了posts_raw，或posts与posts_raw均为None
     """
     from datetime import datetime
 
@@ -157,12 +231,31 @@ def save_posts_batch(
 
     if format == "json":
         file_path = output_dir / f"posts_{timestamp}.json"
-        save_json(posts, file_path, pretty=True)
+        if posts_raw is not None:
+            # 每条已是合法JSON，逐条写出组成数组（效果同orjson.Fragment，但不依赖orjson版本），
+            # 不在内存中另外拼出整个文件
+            _ensure_dir(output_dir)
+            with open(file_path, 'wb') as f:
+                f.write(b'[\n')
+                for index, post_raw in enumerate(posts_raw):
+                    if index:
+                        f.write(b',\n')
+                    f.write(post_raw)
+                f.write(b'\n]')
+        elif posts is not None:
+            save_json(posts, file_path, pretty=True)
+        else:
+            raise ValueError("需要提供posts或posts_raw")
     elif format == "parquet":
+        if posts_raw is not None:
+            raise ValueError("posts_raw仅支持json格式")
+        if posts is None:
+            raise ValueError("parquet格式需要提供posts")
         file_path = output_dir / f"posts_{timestamp}.parquet"
-        save_to_parquet(posts, file_path)
+        save_to_parquet(posts, file_path, schema_overrides=POST_SCHEMA)
     else:
         raise ValueError(f"不支持的格式: {format}")
 
-    logger.info(f"批量保存完成: {file_path} ({len(posts)} 条记录)")
+    record_count = len(posts_raw) if posts_raw is not None else len(posts)
+    logger.info(f"批量保存完成: {file_path} ({record_count} 条记录)")
     return file_path
@@ -2,10 +2,56 @@
 辅助函数模块 - 各种通用工具函数
 """
 import re
+from bisect import bisect_right
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Optional, List, Set
+from functools import lru_cache
+from itertools import chain
+from typing import Callable, Optional, List, Set
 from dateutil import parser as date_parser
 
+try:
+    import ahocorasick  # pyahocorasick，可选：多关键词单次扫描
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# 关键词数达到该值时才使用自动机：关键词少时逐个 in 查找（C实现）更快，
+# 自动机的开销主要在Python层逐个遍历匹配结果
+AHOCORASICK_MIN_KEYWORDS = 50
+
+
+# 相对时间匹配模式（各单位合并为一个正则，一次扫描）及单位对应的时间长度
+RELATIVE_TIME_PATTERN = re.compile(r'(\d+)\s*(秒|分钟|小时|天|周|月|年)前')
+RELATIVE_TIME_UNITS = {
+    '秒': timedelta(seconds=1),
+    '分钟': timedelta(minutes=1),
+    '小时': timedelta(hours=1),
+    '天': timedelta(days=1),
+    '周': timedelta(weeks=1),
+    '月': timedelta(days=30),  # 近似
+    '年': timedelta(days=365),  # 近似
+}
+
+# 常见绝对日期格式：先用strptime逐个尝试，都不匹配再交给较慢的dateutil模糊解析
+DATE_FORMATS = (
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%d',
+    '%Y/%m/%d %H:%M',
+    '%Y/%m/%d',
+    '%Y年%m月%d日 %H:%M',
+    '%Y年%m月%d日',
+)
+
+# format_count的单位表：二分查找得到单位下标，再查除数和后缀
+COUNT_THRESHOLDS = (1_000, 1_000_000, 1_000_000_000)
+COUNT_DIVISORS = (1, 1_000, 1_000_000, 1_000_000_000)
+COUNT_SUFFIXES = ('', 'K', 'M', 'B')
+
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+
 
 def parse_relative_time(time_text: str, reference_time: Optional[datetime] = None) -> Optional[datetime]:
     """
@@ -21,47 +67,22 @@ def parse_relative_time(time_text: str, reference_time: Optional[datetime] = Non
     if not time_text:
         return None
 
-    if reference_time is None:
-        reference_time = datetime.now()
-
     time_text = time_text.strip()
 
-    # 匹配模式
-    patterns = [
-        (r'(\d+)\s*秒前', 'seconds'),
-        (r'(\d+)\s*分钟前', 'minutes'),
-        (r'(\d+)\s*小时前', 'hours'),
-        (r'(\d+)\s*天前', 'days'),
-        (r'(\d+)\s*周前', 'weeks'),
-        (r'(\d+)\s*月前', 'months'),
-        (r'(\d+)\s*年前', 'years'),
-    ]
-
-    for pattern, unit in patterns:
-        match = re.search(pattern, time_text)
-        if match:
-            value = int(match.group(1))
-
-            if unit == 'seconds':
-                delta = timedelta(seconds=value)
-            elif unit == 'minutes':
-                delta = timedelta(minutes=value)
-            elif unit == 'hours':
-                delta = timedelta(hours=value)
-            elif unit == 'days':
-                delta = timedelta(days=value)
-            elif unit == 'weeks':
-                delta = timedelta(weeks=value)
-            elif unit == 'months':
-                delta = timedelta(days=value * 30)  # 近似
-            elif unit == 'years':
-                delta = timedelta(days=value * 365)  # 近似
-            else:
+    match = RELATIVE_TIME_PATTERN.search(time_text)
+    if match:
+        if reference_time is None:
+            reference_time = datetime.now()
+        return reference_time - RELATIVE_TIME_UNITS[match.group(2)] * int(match.group(1))
+
+    # 尝试解析为标准日期格式（以上格式都以年份开头，首字符不是数字时直接跳过）
+    if time_text[:1].isdigit():
+        for date_format in DATE_FORMATS:
+            try:
+                return datetime.strptime(time_text, date_format)
+            except ValueError:
                 continue
 
-            return reference_time - delta
-
-    # 尝试解析为标准日期格式
     try:
         return date_parser.parse(time_text, fuzzy=True)
     except Exception:
@@ -76,7 +97,7 @@ def clean_text(text: str, remove_newlines: bool = False) -> str:
 
     Args:
         text: 原始文本
-        remove_newlines: 是否移除换行符
+        remove_newlines: 仅为兼容旧调用保留，不起作用；换行符总会与其他空白一起合并为单个空格
 
     Returns:
         清理后的文本
@@ -84,20 +105,57 @@ def clean_text(text: str, remove_newlines: bool = False) -> str:
     if not text:
         return ""
 
-    # 移除HTML标签
-    text = re.sub(r'<[^>]+>', '', text)
+    # 移除HTML标签（不含'<'时跳过正则扫描）
+    if '<' in text:
+        text = HTML_TAG_PATTERN.sub('', text)
+
+    # 合并多余空白并去除首尾空白：str.split()与正则\s识别的空白字符相同，
+    # 一次C层切分+拼接即可；换行符也在这里被替换为空格，remove_newlines无需额外处理
+    return ' '.join(text.split())
+
+
+@lru_cache(maxsize=64)
+def _keyword_automaton(keywords: tuple):
+    """把一组关键词构建成Aho-Corasick自动机（按关键词元组缓存），payload为关键词本身"""
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        if keyword:
+            automaton.add_word(keyword, keyword)
+    if len(automaton):
+        automaton.make_automaton()
+    return automaton
+
+
+def find_keywords(text: str, keywords: tuple) -> Set[str]:
+    """
+    找出在文本中出现过的关键词
+
+    安装了pyahocorasick且关键词较多时构建一次自动机后单次扫描文本，否则逐个关键词查找
+
+    Args:
+        text: 要查找的文本（大小写需与关键词一致）
+        keywords: 关键词元组
+
+    Returns:
+        出现过的关键词集合
+    """
+    if not AHOCORASICK_AVAILABLE or len(keywords) < AHOCORASICK_MIN_KEYWORDS:
+        return {keyword for keyword in set(keywords) if keyword in text}
 
-    # 移除多余空白
-    text = re.sub(r'\s+', ' ', text)
+    found = {keyword for keyword in keywords if not keyword}  # 空关键词总是"出现"，与 in 判断一致
+    automaton = _keyword_automaton(keywords)
+    if len(automaton):
+        found.update(keyword for _, keyword in automaton.iter(text))
+    return found
 
-    # 移除换行符（可选）
-    if remove_newlines:
-        text = text.replace('\n', ' ').replace('\r', '')
 
-    # 去除首尾空白
-    text = text.strip()
+def contains_any_keyword(text: str, keywords: tuple) -> bool:
+    """判断文本中是否出现了任一关键词，找到第一个即返回"""
+    if not AHOCORASICK_AVAILABLE or len(keywords) < AHOCORASICK_MIN_KEYWORDS or '' in keywords:
+        return any(keyword in text for keyword in keywords)
 
-    return text
+    automaton = _keyword_automaton(keywords)
+    return len(automaton) > 0 and next(automaton.iter(text), None) is not None
 
 
 def extract_keywords(
@@ -122,17 +180,106 @@ def extract_keywords(
     if not case_sensitive:
         text = text.lower()
 
-    results = {}
+    # (原关键词, 查找用关键词)，所有类别的关键词合并后只扫描一次文本
+    search_pairs = {
+        category: [(keyword, keyword if case_sensitive else keyword.lower()) for keyword in keywords]
+        for category, keywords in keyword_sets.items()
+    }
+    all_keywords = tuple(dict.fromkeys(
+        search_keyword for pairs in search_pairs.values() for _, search_keyword in pairs
+    ))
+    found = find_keywords(text, all_keywords)
 
-    for category, keywords in keyword_sets.items():
-        found = []
-        for keyword in keywords:
-            search_keyword = keyword if case_sensitive else keyword.lower()
-            if search_keyword in text:
-                found.append(keyword)
-        results[category] = found
+    return {
+        category: [keyword for keyword, search_keyword in pairs if search_keyword in found]
+        for category, pairs in search_pairs.items()
+    }
 
-    return results
+
+def make_relevance_scorer(
+    primary_keywords: List[str],
+    secondary_keywords: List[str],
+    exclude_keywords: Optional[List[str]] = None
+) -> Callable[[str], float]:
+    """
+    为固定的关键词配置生成相关性打分函数，得分与calculate_relevance_score相同
+
+    关键词配置通常在启动时确定，逐条打分前只需生成一次：关键词转小写、
+    自动机构建都在这里完成。每个主/次关键词对应掩码中的一位，
+    扫描文本时把命中关键词的位并入掩码，最后用bit_count统计命中数
+
+    Args:
+        primary_keywords: 主关键词列表
+        secondary_keywords: 次关键词列表
+        exclude_keywords: 排除关键词列表
+
+    Returns:
+        打分函数 score(text) -> 相关性得分 (0.0-1.0)
+    """
+    primary_count = len(primary_keywords)
+    secondary_count = len(secondary_keywords)
+    primary_mask = (1 << primary_count) - 1
+
+    # 小写关键词 -> 位掩码（主关键词占低位，次关键词接在后面；重复的关键词占多位）
+    keyword_bits = defaultdict(int)
+    for position, keyword in enumerate(chain(primary_keywords, secondary_keywords)):
+        keyword_bits[keyword.lower()] |= 1 << position
+    always_bits = keyword_bits.pop('', 0)  # 空关键词总是命中，与 in 判断一致
+    exclude_lower = tuple(dict.fromkeys(kw.lower() for kw in exclude_keywords or ()))
+
+    if AHOCORASICK_AVAILABLE and keyword_bits and len(keyword_bits) >= AHOCORASICK_MIN_KEYWORDS:
+        automaton = ahocorasick.Automaton()
+        for keyword, bits in keyword_bits.items():
+            automaton.add_word(keyword, bits)
+        automaton.make_automaton()
+
+        def match_bits(text_lower: str) -> int:
+            mask = always_bits
+            for _, bits in automaton.iter(text_lower):
+                mask |= bits
+            return mask
+    else:
+        keyword_items = tuple(keyword_bits.items())
+
+        def match_bits(text_lower: str) -> int:
+            mask = always_bits
+            for keyword, bits in keyword_items:
+                if keyword in text_lower:
+                    mask |= bits
+            return mask
+
+    def score(text: str) -> float:
+        if not text:
+            return 0.0
+
+        text_lower = text.lower()
+
+        # 检查排除关键词（找到第一个即停止扫描）
+        if exclude_lower and contains_any_keyword(text_lower, exclude_lower):
+            return 0.0  # 包含排除关键词，直接返回0
+
+        mask = match_bits(text_lower)
+        result = 0.0
+
+        # 主关键词匹配（权重0.6）
+        primary_matches = (mask & primary_mask).bit_count()
+        if primary_matches > 0:
+            result += min(primary_matches / primary_count, 1.0) * 0.6
+
+        # 次关键词匹配（权重0.4）
+        secondary_matches = (mask >> primary_count).bit_count()
+        if secondary_matches > 0:
+            result += min(secondary_matches / secondary_count, 1.0) * 0.4
+
+        return min(result, 1.0)
+
+    return score
+
+
+@lru_cache(maxsize=128)
+def _cached_relevance_scorer(primary: tuple, secondary: tuple, exclude: tuple) -> Callable[[str], float]:
+    """按关键词配置缓存make_relevance_scorer生成的打分函数"""
+    return make_relevance_scorer(primary, secondary, exclude)
 
 
 def calculate_relevance_score(
@@ -144,6 +291,8 @@ def calculate_relevance_score(
     """
     计算文本相关性得分
 
+    对大量文本使用同一组关键词打分时，可直接用make_relevance_scorer生成打分函数
+
     Args:
         text: 要分析的文本
         primary_keywords: 主关键词列表
@@ -156,26 +305,11 @@ def calculate_relevance_score(
     if not text:
         return 0.0
 
-    text_lower = text.lower()
-    score = 0.0
-
-    # 检查排除关键词
-    if exclude_keywords:
-        for keyword in exclude_keywords:
-            if keyword.lower() in text_lower:
-                return 0.0  # 包含排除关键词，直接返回0
-
-    # 主关键词匹配（权重0.6）
-    primary_matches = sum(1 for kw in primary_keywords if kw.lower() in text_lower)
-    if primary_matches > 0:
-        score += min(primary_matches / len(primary_keywords), 1.0) * 0.6
-
-    # 次关键词匹配（权重0.4）
-    secondary_matches = sum(1 for kw in secondary_keywords if kw.lower() in text_lower)
-    if secondary_matches > 0:
-        score += min(secondary_matches / len(secondary_keywords), 1.0) * 0.4
-
-    return min(score, 1.0)
+    # 关键词配置通常固定不变，打分函数按配置缓存，不必每次调用都重新lower()和构建自动机
+    scorer = _cached_relevance_scorer(
+        tuple(primary_keywords), tuple(secondary_keywords), tuple(exclude_keywords or ())
+    )
+    return scorer(text)
 
 
 def format_count(count: int) -> str:
@@ -188,14 +322,10 @@ def format_count(count: int) -> str:
     Returns:
         格式化后的字符串
     """
-    if count < 1000:
+    unit = bisect_right(COUNT_THRESHOLDS, count)
+    if unit == 0:
         return str(count)
-    elif count < 1000000:
-        return f"{count / 1000:.1f}K"
-    elif count < 1000000000:
-        return f"{count / 1000000:.1f}M"
-    else:
-        return f"{count / 1000000000:.1f}B"
+    return f"{count / COUNT_DIVISORS[unit]:.1f}{COUNT_SUFFIXES[unit]}"
 
 
 def truncate_text(text: str, max_length: int = 100, suffix: str = "...") -> str:
@@ -2,6 +2,7 @@
 日志配置模块 - 使用loguru进行日志管理
 """
 import sys
+from functools import lru_cache
 from pathlib import Path
 from loguru import logger
 from typing import Optional
@@ -12,7 +13,8 @@ def setup_logger(
     level: str = "INFO",
     rotation: str = "10 MB",
     retention: str = "7 days",
-    console: bool = True
+    console: bool = True,
+    serialize: bool = False
 ) -> None:
     """
     配置全局日志器
@@ -23,6 +25,7 @@ def setup_logger(
         rotation: 日志文件轮转大小
         retention: 日志文件保留时间
         console: 是否输出到控制台
+        serialize: 文件日志是否输出为JSON行（结构化日志，便于用工具检索；默认输出普通文本）
     """
     # 移除默认handler
     logger.remove()
@@ -49,15 +52,19 @@ def setup_logger(
             rotation=rotation,
             retention=retention,
             encoding="utf-8",
+            serialize=serialize,
             enqueue=True  # 异步写入，提高性能
         )
 
     logger.info(f"日志系统初始化完成，级别: {level}")
 
 
+@lru_cache(maxsize=256)
 def get_logger(name: str = __name__):
     """
-    获取logger实例
+    获取logger实例（同名只绑定一次，重复调用返回同一实例）
+
+    绑定的logger与全局logger共享handler，setup_logger重新配置后缓存的实例依然有效
 
     Args:
         name: logger名称